@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+from .jsonlib import loads
+
+log = logging.getLogger(__name__)
+
+
+# Путь к кэшу по умолчанию
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "depviz", "cache.sqlite")
+
+# Время жизни информации о пакете (сутки); зависимости версии неизменны
+DEFAULT_TTL = 24 * 60 * 60
+
+# Версия схемы базы; при несовпадении таблицы пересоздаются
+SCHEMA_VERSION = 2
+
+
+class DiskCache:
+    """
+    Дисковый кэш ответов Cargo API на основе SQLite
+    """
+
+    __slots__ = ('cache_path', 'ttl', 'connection', '_lock')
+
+    def __init__(self, cache_path: str = DEFAULT_CACHE_PATH, ttl: int = DEFAULT_TTL):
+        """
+        Инициализация кэша
+
+        Args:
+            cache_path: путь к файлу базы SQLite
+            ttl: время жизни информации о пакете в секундах
+        """
+        self.cache_path = cache_path
+        self.ttl = ttl
+
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Соединение используется из потоков построения графа под общей блокировкой
+        self.connection = sqlite3.connect(cache_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        try:
+            self._init_schema()
+        except sqlite3.Error:
+            self.connection.close()
+            raise
+
+    def _init_schema(self):
+        """
+        Создает таблицы кэша (пересоздает при смене версии схемы)
+        """
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+
+        with self.connection:
+            if version != SCHEMA_VERSION:
+                self.connection.execute("DROP TABLE IF EXISTS package_info")
+                self.connection.execute("DROP TABLE IF EXISTS deps")
+                self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS package_info ("
+                "name TEXT PRIMARY KEY, json TEXT NOT NULL, etag TEXT, mtime REAL NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS deps ("
+                "name TEXT NOT NULL, version TEXT NOT NULL, json TEXT NOT NULL, "
+                "PRIMARY KEY (name, version))"
+            )
+
+    def get_package_info(self, package_name: str) -> Optional[Any]:
+        """
+        Возвращает закэшированную информацию о пакете, если она не устарела
+
+        Args:
+            package_name: имя пакета
+
+        Returns:
+            Данные из кэша или None при промахе
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT json FROM package_info WHERE name = ? AND mtime > ?",
+                (package_name, time.time() - self.ttl)
+            ).fetchone()
+        return loads(row[0]) if row else None
+
+    def get_stale_package_info(self, package_name: str) -> Optional[Tuple[Any, Optional[str]]]:
+        """
+        Возвращает информацию о пакете вместе с ETag независимо от срока жизни
+        (для условного запроса If-None-Match)
+
+        Args:
+            package_name: имя пакета
+
+        Returns:
+            Пара (данные, ETag) или None при промахе
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT json, etag FROM package_info WHERE name = ?",
+                (package_name,)
+            ).fetchone()
+        return (loads(row[0]), row[1]) if row else None
+
+    def set_package_info(self, package_name: str, data: Any, etag: Optional[str] = None):
+        """
+        Сохраняет информацию о пакете в кэш
+
+        Args:
+            package_name: имя пакета
+            data: ответ API
+            etag: значение заголовка ETag ответа
+        """
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO package_info (name, json, etag, mtime) VALUES (?, ?, ?, ?)",
+                (package_name, json.dumps(data), etag, time.time())
+            )
+
+    def touch_package_info(self, package_name: str):
+        """
+        Продлевает срок жизни записи о пакете (ответ 304 Not Modified)
+
+        Args:
+            package_name: имя пакета
+        """
+        with self._lock, self.connection:
+            self.connection.execute(
+                "UPDATE package_info SET mtime = ? WHERE name = ?",
+                (time.time(), package_name)
+            )
+
+    def get_dependencies(self, package_name: str, version: str) -> Optional[Any]:
+        """
+        Возвращает закэшированные зависимости версии пакета
+
+        Args:
+            package_name: имя пакета
+            version: версия пакета
+
+        Returns:
+            Данные из кэша или None при промахе
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT json FROM deps WHERE name = ? AND version = ?",
+                (package_name, version)
+            ).fetchone()
+        return loads(row[0]) if row else None
+
+    def set_dependencies(self, package_name: str, version: str, data: Any):
+        """
+        Сохраняет зависимости версии пакета в кэш
+
+        Args:
+            package_name: имя пакета
+            version: версия пакета
+            data: список зависимостей
+        """
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO deps (name, version, json) VALUES (?, ?, ?)",
+                (package_name, version, json.dumps(data))
+            )
+
+    def close(self):
+        """
+        Закрывает соединение с базой
+        """
+        with self._lock:
+            self.connection.close()
+
+
+def open_disk_cache(cache_path: str = DEFAULT_CACHE_PATH, ttl: int = DEFAULT_TTL) -> Optional[DiskCache]:
+    """
+    Открывает дисковый кэш; при ошибке работа продолжается без кэша
+
+    Args:
+        cache_path: путь к файлу базы SQLite
+        ttl: время жизни информации о пакете в секундах
+
+    Returns:
+        Экземпляр DiskCache или None, если кэш недоступен
+    """
+    try:
+        return DiskCache(cache_path, ttl)
+    except (OSError, sqlite3.Error) as e:
+        log.warning("Дисковый кэш недоступен (%s), работа без кэша: %s", cache_path, e)
+        return None
@@ -1,79 +1,210 @@
+import argparse
+import logging
 import sys
-import os
 
-# Добавляем путь к src для импорта модулей
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from .config import Config, Settings, create_default_config
+from .fetcher import DEFAULT_REQUEST_INTERVAL, TestDataFetcher
+from .graph import DEFAULT_MAX_WORKERS, DependencyGraph, TestGraphBuilder
 
-from src.config import Config, create_default_config
-from src.fetcher import CargoAPIFetcher, TestDataFetcher
-from src.graph import DependencyGraph, TestGraphBuilder
 
+# Названия этапов разработки для заголовка
+STAGE_TITLES = {
+    1: "Минимальный прототип с конфигурацией",
+    2: "Сбор данных о зависимостях",
+    3: "Основные операции над графом зависимостей"
+}
 
-def main():
+
+def positive_int(value: str) -> int:
+    """
+    Тип аргумента argparse: целое число не меньше 1
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается целое число: {value}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"значение должно быть не меньше 1: {value}")
+    return number
+
+
+def non_negative_float(value: str) -> float:
+    """
+    Тип аргумента argparse: неотрицательное число
+    """
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается число: {value}")
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"значение не может быть отрицательным: {value}")
+    return number
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Разбор аргументов командной строки
+    
+    Args:
+        argv: список аргументов (None = sys.argv[1:])
+        
+    Returns:
+        Пространство имен с аргументами
+    """
+    parser = argparse.ArgumentParser(description="Инструмент визуализации графа зависимостей")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="не использовать дисковый кэш ответов Cargo API"
+    )
+    parser.add_argument(
+        "--stage",
+        type=int,
+        choices=sorted(STAGE_TITLES),
+        default=3,
+        help="выполнить приложение до указанного этапа (по умолчанию 3)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f"число параллельных запросов к Cargo API (по умолчанию {DEFAULT_MAX_WORKERS})"
+    )
+    parser.add_argument(
+        "--request-interval",
+        type=non_negative_float,
+        default=DEFAULT_REQUEST_INTERVAL,
+        help="минимальный интервал между запросами к Cargo API в секундах "
+             f"(по умолчанию {DEFAULT_REQUEST_INTERVAL:g} - без ограничения; "
+             "политика crates.io - 1)"
+    )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="count",
+        default=0,
+        help="подробный вывод хода работы (-v - информация, -vv - отладка)"
+    )
+    return parser.parse_args(argv)
+
+
+def display_summary(settings: Settings):
+    """
+    Выводит краткую сводку предстоящего анализа (требование этапа 1)
+    
+    Args:
+        settings: загруженные параметры конфигурации
+    """
+    print(f"\nГотов к анализу пакета: {settings.package_name}")
+    if settings.test_mode:
+        print("Режим: ТЕСТИРОВАНИЕ (локальные данные)")
+    else:
+        print(f"Режим: ПРОД (данные из: {settings.repo_url})")
+    max_depth = settings.max_depth
+    print(f"Макс. глубина анализа: {max_depth if max_depth != -1 else 'без ограничений'}")
+    if settings.filter_substring:
+        print(f"Фильтрация пакетов: исключаются пакеты содержащие '{settings.filter_substring}'")
+    print(f"Результат будет сохранен в: {settings.output_file}")
+
+
+def main(argv=None):
     """
     Основная функция CLI приложения
     """
+    args = parse_args(argv)
+    
+    # По умолчанию выводятся только предупреждения и ошибки
+    if args.verbose >= 2:
+        level = logging.DEBUG
+    elif args.verbose == 1:
+        level = logging.INFO
+    else:
+        level = logging.WARNING
+    logging.basicConfig(level=level, format="%(levelname)s: %(message)s")
+    
+    stage = args.stage
+    
     print("=== Инструмент визуализации графа зависимостей ===")
-    print("Этап 3: Основные операции над графом зависимостей\n")
+    print(f"Этап {stage}: {STAGE_TITLES[stage]}\n")
     
     try:
-        # Проверяем существование конфигурации
+        # Загружаем конфигурацию; при отсутствии файла создаем стандартный
         config_path = "config.ini"
-        if not os.path.exists(config_path):
+        config = Config(config_path)
+        try:
+            settings = config.load_config()
+        except FileNotFoundError:
             print("Файл конфигурации не найден. Создаем стандартный...")
             create_default_config(config_path)
-        
-        # Загружаем конфигурацию
-        config = Config(config_path)
-        settings = config.load_config()
+            settings = config.load_config()
         
         # Выводим параметры (требование этапа 1)
         config.display_config()
+        
+        if stage == 1:
+            display_summary(settings)
+            print(f"\nЭтап 1 завершен успешно!")
+            return
 
         # создаем граф
         dependency_graph = DependencyGraph()
 
         # Получаем зависимости в зависимости от режима
-        package_name = settings['package_name']
+        package_name = settings.package_name
         
-        if settings['test_mode']:
+        if settings.test_mode:
             print(f"\nРежим: ТЕСТИРОВАНИЕ")
             
-            # демонстрация тестового графа
-            print("\n" + "="*50)
-            print("ДЕМОНСТРАЦИЯ АЛГОРИТМОВ НА ТЕСТОВОМ ГРАФЕ")
-            print("="*50)
-            TestGraphBuilder.display_test_graph()
-            
-            # построение графа для указанного пакета
-            print(f"\nПОСТРОЕНИЕ ГРАФА ДЛЯ '{package_name}':")
-            fetcher = TestDataFetcher()
-            graph = dependency_graph.build_dependency_graph(
-                fetcher, 
-                package_name,
-                max_depth=settings['max_depth'],
-                filter_substring=settings['filter_substring']
-            )
-            dependency_graph.display_graph()
+            if stage == 2:
+                # прямые тестовые зависимости (этап 2)
+                TestDataFetcher.display_test_dependencies(package_name)
+            else:
+                # демонстрация тестового графа
+                print("\n" + "="*50)
+                print("ДЕМОНСТРАЦИЯ АЛГОРИТМОВ НА ТЕСТОВОМ ГРАФЕ")
+                print("="*50)
+                TestGraphBuilder.display_test_graph()
+                
+                # построение графа для указанного пакета
+                print(f"\nПОСТРОЕНИЕ ГРАФА ДЛЯ '{package_name}':")
+                fetcher = TestDataFetcher()
+                graph = dependency_graph.build_dependency_graph(
+                    fetcher, 
+                    package_name,
+                    max_depth=settings.max_depth,
+                    filter_substring=settings.filter_substring
+                )
+                dependency_graph.display_graph()
             
         else:
             print(f"\nРежим: ПРОД")
-            fetcher = CargoAPIFetcher(config.get_api_url())
+            # Сетевые модули нужны только в прод режиме
+            from .cache import open_disk_cache
+            from .fetcher import CargoAPIFetcher
+            
+            cache = None if args.no_cache else open_disk_cache()
+            fetcher = CargoAPIFetcher(
+                config.get_api_url(),
+                cache=cache,
+                max_connections=args.workers,
+                request_interval=args.request_interval
+            )
             
             # сначала покажем прямые зависимости (этап 2)
             fetcher.display_dependencies(package_name)
             
-            # затем построим полный граф (этап 3)
-            print(f"\nПОСТРОЕНИЕ ПОЛНОГО ГРАФА ЗАВИСИМОСТЕЙ:")
-            graph = dependency_graph.build_dependency_graph(
-                fetcher, 
-                package_name,
-                max_depth=settings['max_depth'],
-                filter_substring=settings['filter_substring']
-            )
-            dependency_graph.display_graph()
+            if stage == 3:
+                # затем построим полный граф (этап 3)
+                print(f"\nПОСТРОЕНИЕ ПОЛНОГО ГРАФА ЗАВИСИМОСТЕЙ:")
+                graph = dependency_graph.build_dependency_graph(
+                    fetcher, 
+                    package_name,
+                    max_depth=settings.max_depth,
+                    filter_substring=settings.filter_substring,
+                    max_workers=args.workers
+                )
+                dependency_graph.display_graph()
         
-        print(f"\nЭтап 3 завершен успешно!")
+        print(f"\nЭтап {stage} завершен успешно!")
         
     except FileNotFoundError as e:
         print(f"ОШИБКА: {e}")
@@ -1,6 +1,27 @@
-import configparser
-import os
-from typing import Dict, Any
+from typing import Dict, NamedTuple
+
+
+# Содержимое конфигурационного файла по умолчанию
+DEFAULT_INI = """[settings]
+package_name = serde
+repo_url = https://crates.io
+test_mode = false
+output_file = graph.svg
+max_depth = 5
+filter_substring = test
+"""
+
+
+class Settings(NamedTuple):
+    """
+    Неизменяемый набор загруженных параметров конфигурации
+    """
+    package_name: str
+    repo_url: str
+    test_mode: bool
+    output_file: str
+    max_depth: int
+    filter_substring: str
 
 
 class Config:
@@ -8,6 +29,8 @@ class Config:
     Класс для работы с конфигурацией из INI-файла
     """
     
+    __slots__ = ('config_path', 'settings')
+    
     def __init__(self, config_path: str = "config.ini"):
         """
         Инициализация конфигурации
@@ -26,49 +49,97 @@ class Config:
             'filter_substring': ''        # подстрока для фильтрации
         }
     
-    def load_config(self) -> Dict[str, Any]:
+    def load_config(self) -> Settings:
         """
         Загрузка и парсинг конфигурационного файла
         
         Returns:
-            Словарь с настройками
+            Параметры конфигурации (Settings)
             
         Raises:
             FileNotFoundError: если файл не найден
             ValueError: если неверный формат или значения
         """
-        # Проверяем существование файла
-        if not os.path.exists(self.config_path):
-            raise FileNotFoundError(f"Файл конфигурации не найден: {self.config_path}")
-        
-        # Создаем парсер
-        parser = configparser.ConfigParser()
-        parser.read(self.config_path, encoding='utf-8')
-        
-        # Проверяем наличие секции [settings]
-        if 'settings' not in parser:
-            raise ValueError("В файле конфигурации отсутствует секция [settings]")
+        # Читаем пары ключ-значение секции [settings]
+        values = self._read_settings_section()
         
         # Читаем строковые значения
-        self.settings['package_name'] = parser.get('settings', 'package_name', fallback='')
-        self.settings['repo_url'] = parser.get('settings', 'repo_url', fallback='')
-        self.settings['output_file'] = parser.get('settings', 'output_file', fallback='graph.svg')
-        self.settings['filter_substring'] = parser.get('settings', 'filter_substring', fallback='')
+        self.settings['package_name'] = values.get('package_name', '')
+        self.settings['repo_url'] = values.get('repo_url', '')
+        self.settings['output_file'] = values.get('output_file', 'graph.svg')
+        self.settings['filter_substring'] = values.get('filter_substring', '')
         
         # Читаем булево значение (режим тестирования)
-        test_mode_str = parser.get('settings', 'test_mode', fallback='false').lower()
-        self.settings['test_mode'] = test_mode_str in ('true', 'yes', '1', 'on')
+        test_mode_str = values.get('test_mode', 'false').lower()
+        self.settings['test_mode'] = test_mode_str in {'true', 'yes', '1', 'on'}
         
         # Читаем целочисленное значение (максимальная глубина)
         try:
-            self.settings['max_depth'] = parser.getint('settings', 'max_depth', fallback=-1)
+            self.settings['max_depth'] = int(values.get('max_depth', '-1'))
         except ValueError:
             raise ValueError("Параметр max_depth должен быть целым числом")
         
         # Валидируем конфигурацию
         self._validate_config()
         
-        return self.settings
+        return Settings(**self.settings)
+    
+    def _read_settings_section(self) -> Dict[str, str]:
+        """
+        Минимальный разбор INI-файла: читает только секцию [settings]
+        
+        Returns:
+            Словарь строковых значений (ключи в нижнем регистре)
+            
+        Raises:
+            FileNotFoundError: если файл не найден
+            ValueError: если секция отсутствует или строка имеет неверный формат
+        """
+        # Открываем файл сразу, без отдельной проверки существования
+        try:
+            with open(self.config_path, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Файл конфигурации не найден: {self.config_path}")
+        
+        values = {}
+        found_section = False
+        in_section = False
+        
+        for line_number, raw_line in enumerate(lines, 1):
+            line = raw_line.strip()
+            
+            # Пропускаем пустые строки и комментарии
+            if not line or line[0] in '#;':
+                continue
+            
+            # Заголовок секции
+            if line[0] == '[' and line[-1] == ']':
+                in_section = line[1:-1].strip() == 'settings'
+                found_section = found_section or in_section
+                continue
+            
+            if not in_section:
+                continue
+            
+            # Строки с отступом (многострочные значения) не поддерживаются
+            if raw_line[0].isspace():
+                raise ValueError(f"Неверная строка {line_number} в файле конфигурации: {raw_line}")
+            
+            # Разделитель - первый из '=' или ':' (как в configparser)
+            positions = [i for i in (line.find('='), line.find(':')) if i != -1]
+            if not positions:
+                raise ValueError(f"Неверная строка {line_number} в файле конфигурации: {raw_line}")
+            sep = min(positions)
+            key = line[:sep].strip().lower()
+            if not key:
+                raise ValueError(f"Неверная строка {line_number} в файле конфигурации: {raw_line}")
+            values[key] = line[sep + 1:].strip()
+        
+        if not found_section:
+            raise ValueError("В файле конфигурации отсутствует секция [settings]")
+        
+        return values
     
     def _validate_config(self):
         """
@@ -138,20 +209,8 @@ def create_default_config(config_path: str = "config.ini"):
     Args:
         config_path: путь для сохранения конфигурации
     """
-    config = configparser.ConfigParser()
-    
-    # Секция с настройками
-    config['settings'] = {
-        'package_name': 'serde',
-        'repo_url': 'https://crates.io',
-        'test_mode': 'false',
-        'output_file': 'graph.svg',
-        'max_depth': '5',
-        'filter_substring': 'test'
-    }
-    
-    # Сохраняем конфигурацию
+    # Сохраняем конфигурацию одной записью
     with open(config_path, 'w', encoding='utf-8') as configfile:
-        config.write(configfile)
+        configfile.write(DEFAULT_INI)
     
     print(f"Создан файл конфигурации: {config_path}")
\ No newline at end of file
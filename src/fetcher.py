@@ -1,30 +1,141 @@
-import requests
-import json
-from typing import List, Dict, Any
+import logging
+import sys
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 from urllib.parse import urljoin
 
+log = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from .cache import DiskCache
+
+
+# Размер пула соединений по умолчанию (по нему же выбирается число потоков графа)
+DEFAULT_MAX_CONNECTIONS = 16
+
+# Минимальный интервал между запросами к API в секундах по умолчанию
+# (0 = без ограничения; защитой от перегрузки служит обработка ответа 429)
+DEFAULT_REQUEST_INTERVAL = 0.0
+
+# Число повторов запроса после ответа 429 Too Many Requests
+MAX_RETRIES = 3
+
+# Тестовые данные для демонстрации
+_TEST_DEPENDENCIES = {
+    'A': ('B', 'C', 'D'),
+    'B': ('D', 'E'),
+    'C': ('B', 'F'),
+    'serde': ('serde_derive', 'proc-macro2', 'quote', 'syn'),
+    'tokio': ('bytes', 'mio', 'num_cpus', 'pin-project-lite')
+}
+
+# Зависимости для пакетов, отсутствующих в тестовых данных
+_DEFAULT_TEST_DEPENDENCIES = ('test_dep1', 'test_dep2', 'test_dep3')
+
 
 class CargoAPIFetcher:
     """
     Класс для получения данных о зависимостях из Cargo API
     """
     
-    def __init__(self, base_url: str = "https://crates.io"):
+    __slots__ = ('_requests', '_loads', '_json_error', 'base_url', 'cache',
+                 '_info_url', '_deps_url', 'session', 'request_interval', '_rate_lock', '_next_request_time',
+                 '_results', '_pending', '_fetches_lock')
+    
+    def __init__(self, base_url: str = "https://crates.io", cache: Optional['DiskCache'] = None,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 request_interval: float = DEFAULT_REQUEST_INTERVAL):
         """
         Инициализация API клиента
         
         Args:
             base_url: базовый URL Cargo API
+            cache: дисковый кэш ответов (None = без кэша)
+            max_connections: размер пула соединений (по числу потоков построения графа)
+            request_interval: минимальный интервал между запросами в секундах (0 = без ограничения)
         """
+        # requests и разбор JSON импортируются лениво: в тестовом режиме сеть не нужна
+        import requests
+        from .jsonlib import JSONDecodeError, loads
+        
+        self._requests = requests
+        self._loads = loads
+        self._json_error = JSONDecodeError
         self.base_url = base_url.rstrip('/')
+        self.cache = cache
+        
+        # Шаблоны URL вычисляются один раз на экземпляр
+        self._info_url = f"{self.base_url}/api/v1/crates/{{}}".format
+        self._deps_url = f"{self.base_url}/api/v1/crates/{{}}/{{}}/dependencies".format
         self.session = requests.Session()
         
+        # Пул соединений под параллельные запросы из графа
+        adapter = requests.adapters.HTTPAdapter(pool_connections=max_connections,
+                                                pool_maxsize=max_connections)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Ограничение частоты запросов: время, раньше которого нельзя начать следующий
+        self.request_interval = request_interval
+        self._rate_lock = threading.Lock()
+        self._next_request_time = 0.0
+        
+        # Успешно загруженные зависимости и события незавершенных загрузок по имени
+        # пакета: повторный и параллельный запрос использует уже начатую загрузку
+        self._results: Dict[str, List[str]] = {}
+        self._pending: Dict[str, threading.Event] = {}
+        self._fetches_lock = threading.Lock()
+        
         # Устанавливаем заголовки для вежливого scraping
         self.session.headers.update({
             'User-Agent': 'DependencyVisualizer/1.0 (educational project)',
             'Accept': 'application/json'
         })
     
+    def _throttle(self, delay: float = 0.0):
+        """
+        Ждет своей очереди на запрос с учетом минимального интервала
+        
+        Args:
+            delay: дополнительная пауза для всех последующих запросов (ответ 429)
+        """
+        with self._rate_lock:
+            now = time.monotonic()
+            start = max(now + delay, self._next_request_time)
+            self._next_request_time = start + self.request_interval
+        
+        # Спим вне блокировки, чтобы остальные потоки могли занять следующие слоты
+        if start > now:
+            time.sleep(start - now)
+    
+    def _get(self, url: str, headers: Optional[Dict[str, str]] = None):
+        """
+        GET-запрос с ограничением частоты и повтором после 429 Too Many Requests
+        
+        Args:
+            url: адрес запроса
+            headers: дополнительные заголовки
+            
+        Returns:
+            Объект ответа requests
+        """
+        delay = 0.0
+        for attempt in range(MAX_RETRIES + 1):
+            self._throttle(delay)
+            response = self.session.get(url, headers=headers, timeout=10)
+            if response.status_code != 429 or attempt == MAX_RETRIES:
+                return response
+            
+            # Соблюдаем Retry-After, если сервер его указал
+            try:
+                delay = float(response.headers.get('Retry-After', ''))
+            except ValueError:
+                delay = max(self.request_interval, 1.0) * (attempt + 1)
+            log.warning("Превышен лимит запросов к API, повтор через %.1f с: %s", delay, url)
+        
+        return response
+    
     def get_package_info(self, package_name: str) -> Dict[str, Any]:
         """
         Получает основную информацию о пакете
@@ -39,30 +150,52 @@ class CargoAPIFetcher:
             requests.RequestException: при ошибках сети
             ValueError: если пакет не найден или неверный ответ
         """
-        url = f"{self.base_url}/api/v1/crates/{package_name}"
+        # Сначала пробуем дисковый кэш
+        stale = None
+        if self.cache is not None:
+            cached = self.cache.get_package_info(package_name)
+            if cached is not None:
+                return cached
+            stale = self.cache.get_stale_package_info(package_name)
+        
+        url = self._info_url(package_name)
+        
+        # Устаревшую запись перепроверяем условным запросом по ETag
+        headers = {}
+        if stale is not None and stale[1]:
+            headers['If-None-Match'] = stale[1]
         
         try:
-            response = self.session.get(url, timeout=10)
+            response = self._get(url, headers=headers)
+            
+            # 304: данные не изменились, тело ответа пустое
+            if response.status_code == 304 and stale is not None:
+                self.cache.touch_package_info(package_name)
+                return stale[0]
+            
             response.raise_for_status()  # Проверяем HTTP ошибки
             
-            data = response.json()
+            data = self._loads(response.content)
             
             # Проверяем структуру ответа
             if 'crate' not in data:
                 raise ValueError(f"Неверный формат ответа для пакета {package_name}")
+            
+            if self.cache is not None:
+                self.cache.set_package_info(package_name, data, response.headers.get('ETag'))
                 
             return data
             
-        except requests.exceptions.Timeout:
-            raise requests.RequestException(f"Таймаут при запросе к {url}")
-        except requests.exceptions.ConnectionError:
-            raise requests.RequestException(f"Ошибка соединения с {url}")
-        except requests.exceptions.HTTPError as e:
+        except self._requests.exceptions.Timeout:
+            raise self._requests.RequestException(f"Таймаут при запросе к {url}")
+        except self._requests.exceptions.ConnectionError:
+            raise self._requests.RequestException(f"Ошибка соединения с {url}")
+        except self._requests.exceptions.HTTPError as e:
             if response.status_code == 404:
                 raise ValueError(f"Пакет не найден: {package_name}")
             else:
-                raise requests.RequestException(f"HTTP ошибка {response.status_code}: {e}")
-        except json.JSONDecodeError:
+                raise self._requests.RequestException(f"HTTP ошибка {response.status_code}: {e}")
+        except self._json_error:
             raise ValueError(f"Неверный JSON в ответе от API для {package_name}")
     
     def get_latest_version(self, package_info: Dict[str, Any]) -> str:
@@ -75,8 +208,10 @@ class CargoAPIFetcher:
         Returns:
             Номер последней версии (например, '1.0.197')
         """
-        crate_data = package_info.get('crate', {})
-        latest_version = crate_data.get('max_version')
+        try:
+            latest_version = package_info['crate']['max_version']
+        except KeyError:
+            latest_version = None
         
         if not latest_version:
             raise ValueError("Не удалось определить последнюю версию пакета")
@@ -98,51 +233,100 @@ class CargoAPIFetcher:
             requests.RequestException: при ошибках сети
             ValueError: если зависимости не найдены
         """
-        url = f"{self.base_url}/api/v1/crates/{package_name}/{version}/dependencies"
+        # Зависимости опубликованной версии не меняются, поэтому кэшируются без срока
+        if self.cache is not None:
+            cached = self.cache.get_dependencies(package_name, version)
+            if cached is not None:
+                return cached
+        
+        url = self._deps_url(package_name, version)
         
         try:
-            response = self.session.get(url, timeout=10)
+            response = self._get(url)
             response.raise_for_status()
             
-            data = response.json()
+            data = self._loads(response.content)
             
             # Проверяем структуру ответа
             if 'dependencies' not in data:
                 raise ValueError(f"Неверный формат ответа для зависимостей {package_name} {version}")
+            
+            if self.cache is not None:
+                self.cache.set_dependencies(package_name, version, data['dependencies'])
                 
             return data['dependencies']
             
-        except requests.exceptions.RequestException as e:
-            raise requests.RequestException(f"Ошибка при получении зависимостей: {e}")
-        except json.JSONDecodeError:
+        except self._requests.exceptions.RequestException as e:
+            raise self._requests.RequestException(f"Ошибка при получении зависимостей: {e}")
+        except self._json_error:
             raise ValueError(f"Неверный JSON в ответе для зависимостей {package_name}")
     
     def get_direct_dependencies(self, package_name: str) -> List[str]:
         """
         Получает прямые зависимости пакета (отдельная функция для использования в графе)
+        
+        Успешная загрузка запоминается на время жизни клиента: повторные и
+        параллельные вызовы для того же пакета получают ее результат. Неудачная
+        загрузка не запоминается - следующий вызов повторит запрос.
         """
+        with self._fetches_lock:
+            if package_name in self._results:
+                return self._results[package_name]
+            event = self._pending.get(package_name)
+            owner = event is None
+            if owner:
+                event = threading.Event()
+                self._pending[package_name] = event
+        
+        if not owner:
+            # Загрузку выполняет другой поток; при ее неудаче результата не будет
+            event.wait()
+            with self._fetches_lock:
+                return self._results.get(package_name, [])
+        
         try:
-            # получаем информацию о пакете
-            package_info = self.get_package_info(package_name)
-            
-            # извлекаем последнюю версию
-            latest_version = self.get_latest_version(package_info)
-            
-            # получаем зависимости
-            dependencies = self.get_dependencies(package_name, latest_version)
-            
-            # извлекаем только имена пакетов
-            dependency_names = []
-            for dep in dependencies:
-                crate_id = dep.get('crate_id')
-                if crate_id and crate_id != package_name:
-                    dependency_names.append(crate_id)
-            
-            return dependency_names
-            
+            dependencies = self._fetch_direct_dependencies(package_name)
         except Exception as e:
-            print(f"Ошибка при получении зависимостей {package_name}: {e}")
+            log.warning("Ошибка при получении зависимостей %s: %s", package_name, e)
             return []
+        else:
+            with self._fetches_lock:
+                self._results[package_name] = dependencies
+            return dependencies
+        finally:
+            # Освобождаем ожидающие потоки в том числе при ошибке и прерывании
+            with self._fetches_lock:
+                del self._pending[package_name]
+            event.set()
+    
+    def _fetch_direct_dependencies(self, package_name: str) -> List[str]:
+        """
+        Загружает прямые зависимости пакета из API (или дискового кэша)
+        
+        Raises:
+            requests.RequestException: при ошибках сети
+            ValueError: если пакет не найден или неверный ответ
+        """
+        # получаем информацию о пакете
+        log.info("Получение информации о пакете: %s", package_name)
+        package_info = self.get_package_info(package_name)
+        
+        # извлекаем последнюю версию
+        latest_version = self.get_latest_version(package_info)
+        log.debug("Последняя версия %s: %s", package_name, latest_version)
+        
+        # получаем зависимости
+        dependencies = self.get_dependencies(package_name, latest_version)
+        log.debug("Найдено зависимостей %s: %d", package_name, len(dependencies))
+        
+        # извлекаем только имена пакетов
+        dependency_names = []
+        for dep in dependencies:
+            crate_id = dep.get('crate_id')
+            if crate_id and crate_id != package_name:
+                dependency_names.append(crate_id)
+        
+        return dependency_names
     
     def display_dependencies(self, package_name: str):
         """
@@ -154,19 +338,19 @@ class CargoAPIFetcher:
         try:
             dependencies = self.get_direct_dependencies(package_name)
             
-            print(f"\nПРЯМЫЕ ЗАВИСИМОСТИ ПАКЕТА '{package_name}':")
-            print("=" * 50)
+            parts = [f"\nПРЯМЫЕ ЗАВИСИМОСТИ ПАКЕТА '{package_name}':\n", "=" * 50, "\n"]
             
             if not dependencies:
-                print("Зависимости не найдены")
+                parts.append("Зависимости не найдены\n")
             else:
-                for i, dep in enumerate(dependencies, 1):
-                    print(f"{i:2d}. {dep}")
+                parts.extend(f"{i:2d}. {dep}\n" for i, dep in enumerate(dependencies, 1))
             
-            print("=" * 50)
+            parts.append("=" * 50)
+            parts.append("\n")
+            sys.stdout.write("".join(parts))
             
         except Exception as e:
-            print(f"Ошибка при получении зависимостей: {e}")
+            log.error("Ошибка при получении зависимостей: %s", e)
             return []
 
 
@@ -176,7 +360,7 @@ class TestDataFetcher:
     """
     
     @staticmethod
-    def get_test_dependencies(package_name: str) -> List[str]:
+    def get_test_dependencies(package_name: str) -> Tuple[str, ...]:
         """
         Возвращает тестовые зависимости для демонстрации
         
@@ -184,19 +368,10 @@ class TestDataFetcher:
             package_name: имя пакета (игнорируется в тестовом режиме)
             
         Returns:
-            Список тестовых зависимостей
+            Кортеж тестовых зависимостей
         """
-        # Тестовые данные для демонстрации
-        test_dependencies = {
-            'A': ['B', 'C', 'D'],
-            'B': ['D', 'E'],
-            'C': ['B', 'F'],
-            'serde': ['serde_derive', 'proc-macro2', 'quote', 'syn'],
-            'tokio': ['bytes', 'mio', 'num_cpus', 'pin-project-lite']
-        }
-        
         # Возвращаем зависимости для указанного пакета или стандартный набор
-        return test_dependencies.get(package_name, ['test_dep1', 'test_dep2', 'test_dep3'])
+        return _TEST_DEPENDENCIES.get(package_name, _DEFAULT_TEST_DEPENDENCIES)
     
     @staticmethod
     def display_test_dependencies(package_name: str):
@@ -205,11 +380,9 @@ class TestDataFetcher:
         """
         dependencies = TestDataFetcher.get_test_dependencies(package_name)
         
-        print(f"\nТЕСТОВЫЕ ЗАВИСИМОСТИ ПАКЕТА '{package_name}':")
-        print("=" * 50)
-        
-        for i, dep in enumerate(dependencies, 1):
-            print(f"{i:2d}. {dep}")
+        parts = [f"\nТЕСТОВЫЕ ЗАВИСИМОСТИ ПАКЕТА '{package_name}':\n", "=" * 50, "\n"]
+        parts.extend(f"{i:2d}. {dep}\n" for i, dep in enumerate(dependencies, 1))
+        parts.append("=" * 50)
+        parts.append("\nРежим ТЕСТИРОВАНИЯ - используются локальные данные\n")
         
-        print("=" * 50)
-        print("Режим ТЕСТИРОВАНИЯ - используются локальные данные")
\ No newline at end of file
+        sys.stdout.write("".join(parts))
\ No newline at end of file
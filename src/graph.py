@@ -1,5 +1,16 @@
-from typing import Dict, List, Set, Optional
-from collections import deque
+import logging
+import sys
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .fetcher import DEFAULT_MAX_CONNECTIONS
+
+log = logging.getLogger(__name__)
+
+# Число потоков для параллельного получения зависимостей по умолчанию
+# совпадает с размером пула соединений клиента API
+DEFAULT_MAX_WORKERS = DEFAULT_MAX_CONNECTIONS
 
 
 class DependencyGraph:
@@ -7,133 +18,180 @@ class DependencyGraph:
     Класс для представления и анализа графа зависимостей пакетов
     """
     
+    __slots__ = ('graph', 'visited', '_edge_count')
+    
     def __init__(self):
-        self.graph: Dict[str, List[str]] = {}  # граф зависимостей
+        self.graph: Dict[str, Tuple[str, ...]] = {}  # граф зависимостей
         self.visited: Set[str] = set()         # посещенные узлы
-        self.recursion_stack: Set[str] = set() # стек для обнаружения циклов
+        self._edge_count = 0                   # число ребер, накопленное при построении
     
     def build_dependency_graph(self, fetcher, package_name: str, max_depth: int = -1, 
-                              filter_substring: str = "") -> Dict[str, List[str]]:
+                              filter_substring: str = "", max_workers: int = DEFAULT_MAX_WORKERS) -> Dict[str, Tuple[str, ...]]:
         """
-        Строит полный граф зависимостей с учетом транзитивности используя BFS с рекурсией
+        Строит полный граф зависимостей с учетом транзитивности используя BFS по уровням
         
         Аргументы:
             fetcher: экземпляр CargoAPIFetcher или TestDataFetcher
             package_name: корневой пакет для анализа
-            max_depth: максимальная глубина рекурсии (-1 = без ограничений)
+            max_depth: максимальная глубина обхода (-1 = без ограничений)
             filter_substring: подстрока для фильтрации пакетов
+            max_workers: число потоков для параллельного получения зависимостей
+                (тестовые данные читаются без пула потоков)
             
         Возвращает:
             Словарь представляющий граф зависимостей
         """
-        print(f" Построение графа зависимостей для '{package_name}'...")
-        print(f"   Макс. глубина: {max_depth if max_depth != -1 else 'без ограничений'}")
+        log.info("Построение графа зависимостей для '%s'...", package_name)
+        log.info("Макс. глубина: %s", max_depth if max_depth != -1 else 'без ограничений')
         if filter_substring:
-            print(f"   Фильтр: исключаются пакеты содержащие '{filter_substring}'")
+            log.info("Фильтр: исключаются пакеты содержащие '%s'", filter_substring)
         
         self.graph = {}
         self.visited.clear()
+        self._edge_count = 0
         
-        # Запускаем BFS с рекурсией
-        self._bfs_with_recursion(fetcher, package_name, max_depth, filter_substring, current_depth=0)
+        # Выбираем метод получения зависимостей один раз для всего обхода
+        if hasattr(fetcher, 'get_test_dependencies'):
+            # Тестовый режим: локальные данные, потоки не нужны
+            self._bfs(None, fetcher.get_test_dependencies, package_name, max_depth, filter_substring)
+        else:
+            # Продакшн режим: сетевые запросы уровня выполняются параллельно
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                self._bfs(pool, fetcher.get_direct_dependencies, package_name, max_depth,
+                          filter_substring)
         
-        print(f" Граф построен: {len(self.graph)} пакетов, {sum(len(deps) for deps in self.graph.values())} зависимостей")
+        print(f" Граф построен: {len(self.graph)} пакетов, {self._edge_count} зависимостей")
         return self.graph
     
-    def _bfs_with_recursion(self, fetcher, package: str, max_depth: int, 
-                           filter_substring: str, current_depth: int):
+    def _bfs(self, pool: Optional[ThreadPoolExecutor], fetch_fn: Callable[[str], Sequence[str]],
+             package_name: str, max_depth: int, filter_substring: str):
         """
-        BFS с рекурсией для построения графа зависимостей
+        BFS по уровням: зависимости всех пакетов уровня запрашиваются параллельно
         
         Аргументы:
-            fetcher: экземпляр фетчера
-            package: текущий пакет для анализа
+            pool: пул потоков для запросов (None = последовательно в текущем потоке)
+            fetch_fn: функция получения зависимостей пакета
+            package_name: корневой пакет
             max_depth: максимальная глубина
             filter_substring: подстрока для фильтрации
-            current_depth: текущая глубина рекурсии
         """
-        # Проверяем ограничение глубины
-        if max_depth != -1 and current_depth > max_depth:
-            return
-        
-        # Проверяем циклы
-        if package in self.recursion_stack:
-            print(f"  Обнаружен цикл: {package}")
-            return
-        
-        # Если пакет уже посещен на этом уровне, пропускаем
-        if package in self.visited:
-            return
-        
-        self.visited.add(package)
-        self.recursion_stack.add(package)
+        frontier = [package_name]
+        depth = 0
+        has_filter = bool(filter_substring)
         
+        futures = {}
         try:
-            # Получаем зависимости текущего пакета
-            if hasattr(fetcher, 'get_test_dependencies'):
-                # Тестовый режим
-                dependencies = fetcher.get_test_dependencies(package)
-            else:
-                # Продакшн режим
-                dependencies = fetcher.get_direct_dependencies(package)
-            
-            # Фильтруем зависимости
-            filtered_dependencies = []
-            for dep in dependencies:
-                if filter_substring and filter_substring in dep:
-                    print(f"    Отфильтрован: {dep}")
-                    continue
-                filtered_dependencies.append(dep)
-            
-            # Добавляем в граф
-            self.graph[package] = filtered_dependencies
-            
-            # Рекурсивно обрабатываем зависимости
-            for dep in filtered_dependencies:
-                self._bfs_with_recursion(fetcher, dep, max_depth, filter_substring, current_depth + 1)
+            while frontier and (max_depth == -1 or depth <= max_depth):
+                # Отмечаем пакеты посещенными до отправки, чтобы не запрашивать их дважды
+                futures = {}
+                for package in frontier:
+                    if package in self.visited:
+                        continue
+                    self.visited.add(package)
+                    futures[package] = pool.submit(fetch_fn, package) if pool is not None else None
+                
+                next_frontier = []
+                # Результаты забираем в порядке отправки, чтобы порядок графа был стабильным
+                for package, future in futures.items():
+                    try:
+                        dependencies = future.result() if future is not None else fetch_fn(package)
+                    except Exception as e:
+                        log.warning("Ошибка при обработке пакета %s: %s", package, e)
+                        continue
+                    
+                    # Фильтруем зависимости
+                    if has_filter:
+                        filtered_dependencies = tuple(d for d in dependencies if filter_substring not in d)
+                        if (len(filtered_dependencies) != len(dependencies)
+                                and log.isEnabledFor(logging.INFO)):
+                            removed = [d for d in dependencies if filter_substring in d]
+                            log.info("Отфильтрованы зависимости %s: %s", package, ", ".join(removed))
+                    else:
+                        filtered_dependencies = tuple(dependencies)
+                    
+                    # Добавляем в граф
+                    self.graph[package] = filtered_dependencies
+                    self._edge_count += len(filtered_dependencies)
+                    
+                    # Непосещенные зависимости образуют следующий уровень
+                    for dep in filtered_dependencies:
+                        if dep not in self.visited:
+                            next_frontier.append(dep)
                 
-        except Exception as e:
-            print(f" Ошибка при обработке пакета {package}: {e}")
-        finally:
-            self.recursion_stack.remove(package)
+                frontier = next_frontier
+                depth += 1
+        except BaseException:
+            # Ошибка или прерывание (Ctrl-C): отменяем еще не начатые запросы,
+            # иначе пул при закрытии дождется выполнения всей очереди
+            for future in futures.values():
+                if future is not None:
+                    future.cancel()
+            raise
     
     def detect_cycles(self) -> List[List[str]]:
         """
-        Обнаруживает циклические зависимости в графе
+        Обнаруживает циклические зависимости в графе алгоритмом Тарьяна
+        
+        Находит циклические компоненты - сильно связные компоненты из двух и
+        более пакетов или пакеты, зависящие сами от себя. Внутри компоненты каждый
+        пакет достижим из любого другого, но порядок пакетов не является путем
+        в графе. Сложность O(V + E).
         
         Возвращает:
-            Список циклов (каждый цикл - список пакетов)
+            Список циклических компонент (каждая - список пакетов в порядке обхода)
         """
-        visited = set()
-        recursion_stack = set()
+        index: Dict[str, int] = {}     # порядковый номер узла при обходе
+        lowlink: Dict[str, int] = {}   # наименьший номер, достижимый из поддерева
+        on_stack: Set[str] = set()
+        stack: List[str] = []
         cycles = []
         
-        def dfs(node: str, path: List[str]):
-            if node in recursion_stack:
-                # найден цикл
-                cycle_start = path.index(node)
-                cycle = path[cycle_start:]
-                if cycle not in cycles:
-                    cycles.append(cycle)
-                return
-            
-            if node in visited:
-                return
-            
-            visited.add(node)
-            recursion_stack.add(node)
-            path.append(node)
+        for root in self.graph:
+            if root in index:
+                continue
             
-            for neighbor in self.graph.get(node, []):
-                dfs(neighbor, path.copy())
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.graph.get(root, ())))]
             
-            recursion_stack.remove(node)
-            path.pop()
-        
-        for node in self.graph:
-            if node not in visited:
-                dfs(node, [])
+            while work:
+                node, neighbors = work[-1]
+                
+                for neighbor in neighbors:
+                    if neighbor not in index:
+                        # Спускаемся в непосещенного соседа
+                        index[neighbor] = lowlink[neighbor] = len(index)
+                        stack.append(neighbor)
+                        on_stack.add(neighbor)
+                        work.append((neighbor, iter(self.graph.get(neighbor, ()))))
+                        break
+                    if neighbor in on_stack:
+                        lowlink[node] = min(lowlink[node], index[neighbor])
+                else:
+                    # Все соседи обработаны - возвращаемся к родителю
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    
+                    if lowlink[node] == index[node]:
+                        # node - корень компоненты: снимаем ее со стека
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        
+                        if len(component) > 1 or node in self.graph.get(node, ()):
+                            component.reverse()
+                            cycles.append(component)
         
+        # Компоненты выдаются в обратном топологическом порядке;
+        # упорядочиваем их по первому посещению для стабильного вывода
+        cycles.sort(key=lambda component: index[component[0]])
         return cycles
     
     def get_dependency_count(self) -> Dict[str, int]:
@@ -153,25 +211,41 @@ class DependencyGraph:
             print(" Граф пуст")
             return
         
-        print(f"\n ГРАФ ЗАВИСИМОСТЕЙ ({len(self.graph)} пакетов):")
-        print("=" * 60)
+        # Собираем вывод целиком и печатаем одной записью
+        parts = [f"\n ГРАФ ЗАВИСИМОСТЕЙ ({len(self.graph)} пакетов):\n", "=" * 60, "\n"]
+        append = parts.append
         
         for package, dependencies in self.graph.items():
             if dependencies:
-                deps_str = ", ".join(dependencies)
-                print(f" {package}")
-                print(f"   └── зависит от: {deps_str}")
+                append(f" {package}\n   └── зависит от: {', '.join(dependencies)}\n")
             else:
-                print(f" {package} (нет зависимостей)")
+                append(f" {package} (нет зависимостей)\n")
         
-        print("=" * 60)
+        append("=" * 60)
+        append("\n")
         
         # показываем циклы если есть
         cycles = self.detect_cycles()
         if cycles:
-            print(f" Обнаружено циклов: {len(cycles)}")
+            append(f" Обнаружено циклических компонент: {len(cycles)}\n")
             for i, cycle in enumerate(cycles, 1):
-                print(f"   Цикл {i}: {' → '.join(cycle)} → ...")
+                append(f"   Компонента {i}: {{{', '.join(sorted(cycle))}}}\n")
+        
+        sys.stdout.write("".join(parts))
+
+
+# Тестовый граф с циклами и сложными зависимостями
+_TEST_GRAPH = MappingProxyType({
+    'A': ('B', 'C'),
+    'B': ('D', 'E'),
+    'C': ('B', 'F'),
+    'D': ('G',),
+    'E': ('D', 'H'),
+    'F': ('E', 'I'),
+    'G': ('B',),  # цикл: B -> D -> G -> B
+    'H': (),      # конечный узел
+    'I': ('F',)   # цикл: F -> I -> F
+})
 
 
 class TestGraphBuilder:
@@ -180,26 +254,14 @@ class TestGraphBuilder:
     """
     
     @staticmethod
-    def build_test_graph() -> Dict[str, List[str]]:
+    def build_test_graph() -> Mapping[str, Tuple[str, ...]]:
         """
         Строит тестовый граф для демонстрации
         
         Returns:
-            Тестовый граф зависимостей
+            Тестовый граф зависимостей (неизменяемое представление)
         """
-        # Тестовый граф с циклами и сложными зависимостями
-        test_graph = {
-            'A': ['B', 'C'],
-            'B': ['D', 'E'],
-            'C': ['B', 'F'],
-            'D': ['G'],
-            'E': ['D', 'H'],
-            'F': ['E', 'I'],
-            'G': ['B'],  # цикл: B -> D -> G -> B
-            'H': [],     # конечный узел
-            'I': ['F']   # цикл: F -> I -> F
-        }
-        return test_graph
+        return _TEST_GRAPH
     
     @staticmethod
     def display_test_graph():
@@ -208,7 +270,7 @@ class TestGraphBuilder:
         """
         graph = TestGraphBuilder.build_test_graph()
         dependency_graph = DependencyGraph()
-        dependency_graph.graph = graph
+        dependency_graph.graph = dict(graph)
         
         print(" ТЕСТОВЫЙ ГРАФ:")
         dependency_graph.display_graph()
@@ -216,6 +278,6 @@ class TestGraphBuilder:
         # анализ циклов
         cycles = dependency_graph.detect_cycles()
         if cycles:
-            print(f"\n ОБНАРУЖЕНЫ ЦИКЛЫ:")
+            print(f"\n ОБНАРУЖЕНЫ ЦИКЛИЧЕСКИЕ КОМПОНЕНТЫ:")
             for i, cycle in enumerate(cycles, 1):
-                print(f"   Цикл {i}: {' → '.join(cycle)}")
\ No newline at end of file
+                print(f"   Компонента {i}: {{{', '.join(sorted(cycle))}}}")
\ No newline at end of file
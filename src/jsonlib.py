@@ -0,0 +1,12 @@
+import json
+
+# Быстрый разбор JSON: orjson, если установлен, иначе стандартный json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError наследуется от json.JSONDecodeError
+JSONDecodeError = json.JSONDecodeError
+
+loads = orjson.loads if orjson is not None else json.loads